@@ -6,6 +6,9 @@ from mysql_cli.query import (
     SelectMany,
     Transactional,
     Update,
+    insert_many,
+    named_row,
+    scope,
 )
 
 from mysql_cli.utils import (
@@ -13,3 +16,19 @@ from mysql_cli.utils import (
     init_from_conf_dict,
     init_from_conf_file,
 )
+
+__all__ = [
+    "BatchInsert",
+    "Delete",
+    "Insert",
+    "Select",
+    "SelectMany",
+    "Transactional",
+    "Update",
+    "get_connection",
+    "init_from_conf_dict",
+    "init_from_conf_file",
+    "insert_many",
+    "named_row",
+    "scope",
+]
@@ -0,0 +1,99 @@
+"""Optional asyncio support backed by aiomysql.
+
+AsyncSelect/AsyncSelectMany mirror the blocking decorators but await their
+queries on an aiomysql pool, so one event loop thread can keep many queries
+in flight instead of blocking a thread per statement. Placeholder parsing and
+statement expansion are shared with the blocking decorators; aiomysql speaks
+the text protocol with "%s" binding, so expansion emits "%s" marks for these
+decorators. Transactional and scope are not supported here.
+
+Install with the extra: pip install mysql-cli[async]
+"""
+try:
+    import aiomysql
+except ModuleNotFoundError:
+    aiomysql = None
+
+from mysql_cli.query import Select, SelectMany, _pmarks
+
+_pool = None
+
+
+async def init_from_conf_dict(mysql_conf: dict):
+    """Create the aiomysql pool, kwargs follow aiomysql.create_pool.
+
+    :param mysql_conf: aiomysql connection arguments, like host, port, db,
+        user, password, minsize, maxsize, autocommit
+    :return: the created pool
+    """
+    if aiomysql is None:
+        raise RuntimeError("aiomysql not installed, install mysql-cli[async].")
+    global _pool
+    _pool = await aiomysql.create_pool(**mysql_conf)
+    return _pool
+
+
+async def close():
+    """Close the aiomysql pool and wait for released connections."""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+
+def _get_pool():
+    if _pool is None:
+        raise RuntimeError("MySQL async pool not inited, see mysql_cli.aio.init_from_conf_dict.")
+    return _pool
+
+
+class AsyncSelect(Select):
+    """Execute select sql on the asyncio pool and return one row.
+
+    """
+
+    def __init__(self, sql, dictionary=True, row_factory=None):
+        super().__init__(sql, dictionary, row_factory)
+        # aiomysql binds with "%s" only, emit it during expansion so literal
+        # text is never rewritten after the statement is built
+        self._param_mark, self._param_run = '%s', _pmarks
+
+    async def execute_in_wrapper(self, *args, **kwargs):
+        sql, values = self.build_statement(*args, **kwargs)
+        pool = _get_pool()
+        async with pool.acquire() as cnx:
+            cursor_cls = aiomysql.DictCursor if self._cursor_dictionary else aiomysql.Cursor
+            async with cnx.cursor(cursor_cls) as cur:
+                await cur.execute(sql, values)
+                row = await cur.fetchone()
+                if row is None:
+                    return None
+                if self.row_factory is not None:
+                    column_names = tuple(column[0] for column in cur.description)
+                    return self.row_factory(column_names, row)
+                return row
+
+
+class AsyncSelectMany(SelectMany, AsyncSelect):
+    """Execute select sql on the asyncio pool and return many rows.
+
+    Streaming is not supported, rows are fetched in one pass.
+    """
+
+    def __init__(self, sql, dictionary=True, row_factory=None):
+        super().__init__(sql, dictionary, row_factory=row_factory)
+
+    async def execute_in_wrapper(self, *args, **kwargs):
+        sql, values = self.build_statement(*args, **kwargs)
+        pool = _get_pool()
+        async with pool.acquire() as cnx:
+            cursor_cls = aiomysql.DictCursor if self._cursor_dictionary else aiomysql.Cursor
+            async with cnx.cursor(cursor_cls) as cur:
+                await cur.execute(sql, values)
+                rows = await cur.fetchall()
+                if self.row_factory is not None:
+                    row_factory = self.row_factory
+                    column_names = tuple(column[0] for column in cur.description)
+                    return [row_factory(column_names, row) for row in rows]
+                return rows
@@ -1,7 +1,14 @@
-import tomli
+try:
+    import tomllib
+except ModuleNotFoundError:
+    # tomllib entered the standard library in Python 3.11
+    import tomli as tomllib
 
 from mysql.connector.pooling import MySQLConnectionPool, PooledMySQLConnection
 
+# module level pool reference, read directly on the query hot path
+_pool = None
+
 
 class MySQLWrapper:
     # borg pattern
@@ -11,13 +18,12 @@ class MySQLWrapper:
         self.__dict__ = self._shared_state
         if pool is not None:
             self.mysql_connection_pool = pool
+            global _pool
+            _pool = pool
 
     @classmethod
     def get_connection(cls) -> PooledMySQLConnection:
-        new_instance = cls()
-        if not hasattr(new_instance, "mysql_connection_pool"):
-            raise RuntimeError("MySQL not inited, see mysql_cli.init_from_* method.")
-        return new_instance.mysql_connection_pool.get_connection()
+        return get_connection()
 
     @classmethod
     def init_from_conf_dict(cls, mysql_conf: dict):
@@ -34,6 +40,14 @@ class MySQLWrapper:
         return cls(MySQLConnectionPool(**mysql_conf))
 
 
+def get_connection() -> PooledMySQLConnection:
+    if _pool is None:
+        raise RuntimeError("MySQL not inited, see mysql_cli.init_from_* method.")
+    return _pool.get_connection()
+
+
 def parse_mysql_conf(mysql_conf_file):
-    with open(mysql_conf_file) as f:
-        return tomli.loads(f.read())
+    # toml parsing requires a binary stream, parse it without reading
+    # the whole file into an intermediate string first
+    with open(mysql_conf_file, "rb") as f:
+        return tomllib.load(f)
@@ -1,4 +1,8 @@
+import collections
+import contextlib
 import functools
+import itertools
+import string
 import threading
 import types
 from abc import abstractmethod
@@ -8,10 +12,94 @@ import mysql_cli
 
 thread_local = threading.local()
 
+# ":word" placeholder like ":name", compiled once at import
+_PLACEHOLDER_RE = re.compile(r':(\w+)')
+# translate table deleting every character allowed in "groupby"/"orderby" values
+_IDENT_DELETE_TABLE = str.maketrans('', '', string.ascii_letters + string.digits + '_ ')
+
+
+def _is_safe_identifier(value):
+    # one C level pass, an empty remainder means only whitelisted characters
+    return not value.translate(_IDENT_DELETE_TABLE)
+
+# pre-joined "?" runs keyed by length, shared by all decorators
+_QMARKS = {}
+
+
+def _qmarks(n):
+    s = _QMARKS.get(n)
+    if s is None:
+        s = _QMARKS[n] = ', '.join(['?'] * n)
+    return s
+
+
+# pre-joined "%s" runs for statements executed on plain cursors
+_PMARKS = {}
+
+
+def _pmarks(n):
+    s = _PMARKS.get(n)
+    if s is None:
+        s = _PMARKS[n] = ', '.join(['%s'] * n)
+    return s
+
+
+# max prepared cursors cached per connection
+_PREPARED_CACHE_SIZE = 128
+# max expanded statements cached per decorator, keyed by parameter shape
+_SQL_CACHE_SIZE = 128
+
+# split "insert ... values (?, ?) ..." into prefix, row template and suffix
+_INSERT_VALUES_RE = re.compile(r'(.*\bvalues\s*)(\(\s*\?(?:\s*,\s*\?)*\s*\))(.*)', re.IGNORECASE | re.DOTALL)
+# max rows composed into one multi-row insert statement
+_BATCH_INSERT_ROWS = 1000
+
+
+def _get_cursor(cnx, sql, dictionary=False, prepared=True):
+    """Return a cursor for sql, reusing one already created on cnx.
+
+    Cursors are cached on the connection keyed by (sql text, dictionary), so
+    executing the same prepared statement again on the same connection skips
+    the COM_STMT_PREPARE round trip. Cached cursors are kept open until the
+    connection is returned to the pool; least recently used cursors are
+    closed when the cache is full.
+    :param cnx: mysql connection object
+    :param sql: sql statement text
+    :param dictionary: create a cursor fetching rows as dictionary
+    :param prepared: create a server-side prepared cursor
+    :return: cursor created from cnx
+    """
+    cache = getattr(cnx, "_prepared_cursors", None)
+    if cache is None:
+        cache = collections.OrderedDict()
+        cnx._prepared_cursors = cache
+    key = (sql, dictionary)
+    cur = cache.get(key)
+    if cur is not None:
+        cache.move_to_end(key)
+        return cur
+    cur = cnx.cursor(prepared=prepared, dictionary=dictionary)
+    cache[key] = cur
+    if len(cache) > _PREPARED_CACHE_SIZE:
+        _, evicted = cache.popitem(last=False)
+        evicted.close()
+    return cur
+
+
+class _TxState:
+    """Per thread transaction state, stored as one slotted attribute on thread_local."""
+
+    __slots__ = ("cnx", "depth")
+
+    def __init__(self):
+        self.cnx = None
+        self.depth = 0
+
 
 class Transactional:
     def __init__(self, func):
-        functools.update_wrapper(self, func)
+        # updated=() skips merging func.__dict__ into the decorator instance
+        functools.update_wrapper(self, func, updated=())
         self.func = func
 
     def __call__(self, *args, **kwargs):
@@ -20,118 +108,224 @@ class Transactional:
     def __get__(self, instance, cls):
         if instance is None:
             return self
-        else:
-            return types.MethodType(self, instance)
+        bound = types.MethodType(self, instance)
+        # non-data descriptor: the cached entry in the instance dict takes
+        # priority on later lookups, so each access after the first is a
+        # plain dict hit with no MethodType allocation
+        try:
+            instance.__dict__[self.__name__] = bound
+        except AttributeError:
+            pass  # instances with __slots__, bind on every access
+        return bound
 
     def execute_in_wrapper(self, *args, **kwargs):
-        tx_cnx, _ = _get_tx_cnx_and_cur(create=True)
-        if not tx_cnx.in_transaction:
-            # new transaction on top level, control commit and rollback
+        state = getattr(thread_local, "tx_state", None)
+        if state is None:
+            state = _TxState()
+            thread_local.tx_state = state
+        if state.cnx is None:
+            state.cnx = mysql_cli.get_connection()
+        # nesting is tracked with a plain counter instead of probing the
+        # connection's in_transaction property on every descent
+        state.depth += 1
+        if state.depth > 1:
+            # already in transaction
             try:
-                tx_cnx.start_transaction()
-                result = self.func(*args, **kwargs)
-                tx_cnx.commit()
-                return result
-            except:
-                tx_cnx.rollback()
-                raise
+                return self.func(*args, **kwargs)
             finally:
-                # clear thread local connection status
-                _clear_tx_status()
-        else:
-            # already in transaction
-            return self.func(*args, **kwargs)
-
-
-def _get_tx_cnx_and_cur(create=True):
-    tx_cnx = thread_local.__dict__.get("tx_cnx")
-    if not tx_cnx and create:
-        tx_cnx = mysql_cli.get_connection()
-        thread_local.tx_cnx = tx_cnx
-
-    tx_cur = thread_local.__dict__.get("tx_cur")
-    if not tx_cur and create:
-        tx_cur = tx_cnx.cursor(prepared=True)
-        thread_local.tx_cur = tx_cur
-
-    return tx_cnx, tx_cur
+                state.depth -= 1
+        # new transaction on top level, control commit and rollback
+        tx_cnx = state.cnx
+        try:
+            tx_cnx.start_transaction()
+            result = self.func(*args, **kwargs)
+            tx_cnx.commit()
+            return result
+        except BaseException:
+            tx_cnx.rollback()
+            raise
+        finally:
+            # clear thread local connection status
+            _clear_tx_status()
+
+
+@contextlib.contextmanager
+def scope():
+    """Hold one pooled connection on the current thread while the block runs.
+
+    Non-transactional queries inside the block share that connection and its
+    prepared cursors instead of checking one out of the pool per call, which
+    suits request-scoped usage in web handlers. Nested scopes reuse the outer
+    connection; the connection goes back to the pool when the outermost scope
+    exits. Transactions keep their own connection and are unaffected.
+    """
+    if getattr(thread_local, "scope_cnx", None) is not None:
+        # already scoped on this thread, nest transparently
+        yield
+        return
+    cnx = mysql_cli.get_connection()
+    thread_local.scope_cnx = cnx
+    try:
+        yield
+    finally:
+        thread_local.scope_cnx = None
+        # close cursors prepared during the scope before recycling
+        cursors = getattr(cnx, "_prepared_cursors", None)
+        if cursors:
+            for cur in cursors.values():
+                cur.close()
+        cnx.close()
 
 
 def _clear_tx_status():
-    tx_cur = thread_local.__dict__.get("tx_cur")
-    if tx_cur:
-        tx_cur.close()
-        del thread_local.tx_cur
-
-    tx_cnx = thread_local.__dict__.get("tx_cnx")
-    if tx_cnx:
-        tx_cnx.close()
-        del thread_local.tx_cnx
+    state = getattr(thread_local, "tx_state", None)
+    if state is not None and state.cnx is not None:
+        # close cursors prepared during the transaction before recycling
+        cursors = getattr(state.cnx, "_prepared_cursors", None)
+        if cursors:
+            for cur in cursors.values():
+                cur.close()
+        state.cnx.close()
+        # keep the state object on the thread local for the next transaction,
+        # resetting slots is cheaper than delattr/setattr churn on the TLS dict
+        state.cnx = None
+        state.depth = 0
 
 
 class _BaseQuery:
+    # set on modifying queries so standalone writes commit before pool return
+    _needs_commit = False
+    # overridden on selects returning dictionary rows straight from the cursor
+    _cursor_dictionary = False
+
     def __init__(self, sql):
         """Init base decorator.
 
         :param sql: sql statement to execute
         """
         self.sql = sql
+        self.func = None
+        # ":word" placeholders are fixed by the statement, tokenize once: even
+        # indexes are literal fragments, odd indexes are placeholder names
+        self._word_parts = _PLACEHOLDER_RE.split(sql)
+        self._word_placeholders = self._word_parts[1::2]
+        # "?" placeholders likewise, split the template once at decoration time
+        self._qmark_parts = sql.split('?')
+        self._qmark_count = len(self._qmark_parts) - 1
+        # identifier placeholders interpolate data into the statement text, so
+        # the stream of distinct statements would churn server-side prepares;
+        # run those on a plain cursor with client-side "%s" binding instead
+        self._use_prepared = ("groupby" not in self._word_placeholders
+                              and "orderby" not in self._word_placeholders)
+        # the binding mark is fixed by the cursor kind, choose it here so
+        # expansion emits the right style directly with no post conversion
+        if self._use_prepared:
+            self._param_mark, self._param_run = '?', _qmarks
+        else:
+            self._param_mark, self._param_run = '%s', _pmarks
+        # the placeholder style is fixed by the template, pick the parse
+        # variant here instead of re-branching on every call
+        if self._word_placeholders:
+            if self._qmark_count:
+                self._parse_search_variant = self._mixed_placeholder_error
+            else:
+                self._parse_search_variant = self._parse_word_statement
+        elif self._qmark_count:
+            self._parse_search_variant = self._parse_qmark_statement
+        else:
+            self._parse_search_variant = self._parse_plain_statement
+        # expanded statements keyed by parameter shape, LRU capped
+        self._sql_cache = collections.OrderedDict()
 
     @abstractmethod
-    def execute_sql(self, cnx, cur, *args, **kwargs):
+    def execute_sql(self, cnx, cur, sql, values):
         """Implement how to deal with sql.
 
-        After execution, the connection and cursor with be closed automatically
+        After execution, the connection will be recycled automatically,
+        the cursor stays cached on the connection for statement reuse
         :param cnx: mysql connection object
         :param cur: prepared cursor created from cnx
-        :param args: function call args
-        :param kwargs: function call kwargs
+        :param sql: final sql statement built by build_statement
+        :param values: sql params built by build_statement
         :return:
         """
         raise NotImplementedError("implement execute_sql method in subclass.")
 
-    def __call__(self, func):
-        self.func = func
+    def build_statement(self, *args, **kwargs):
+        """Build the final statement and its params from the function call.
 
-        @functools.wraps(func)
-        def wrapped(*args, **kwargs):
-            return self.execute_in_wrapper(*args, **kwargs)
+        :param args: function call args
+        :param kwargs: function call kwargs
+        :return: (sql, params sequence)
+        """
+        return self.sql, self.parse_sql_params(*args, **kwargs)
 
-        return wrapped
+    def __call__(self, *args, **kwargs):
+        if self.func is None:
+            # decorating, wire the target function and return self as the callable
+            func = args[0]
+            functools.update_wrapper(self, func, updated=())
+            self.func = func
+            return self
+        return self.execute_in_wrapper(*args, **kwargs)
+
+    def __get__(self, instance, cls):
+        if instance is None:
+            return self
+        bound = types.MethodType(self, instance)
+        # same bound method caching as Transactional.__get__
+        try:
+            instance.__dict__[self.__name__] = bound
+        except AttributeError:
+            pass
+        return bound
 
     def execute_in_wrapper(self, *args, **kwargs):
-        tx_cnx, tx_cur = _get_tx_cnx_and_cur(create=False)
-        if tx_cnx and tx_cur:
-            # use shared thread local connection
-            return self.execute_sql(tx_cnx, tx_cur, *args, **kwargs)
-        else:
-            with mysql_cli.get_connection() as cnx:
-                with cnx.cursor(prepared=True) as cur:
-                    return self.execute_sql(cnx, cur, *args, **kwargs)
+        # build the statement before touching the pool, so the prepared
+        # cursor cache is keyed by the text actually executed and calls
+        # with different parameter shapes do not thrash one cursor
+        sql, values = self.build_statement(*args, **kwargs)
+        # one attribute load on the hot path, no helper call
+        state = getattr(thread_local, "tx_state", None)
+        tx_cnx = state.cnx if state is not None else None
+        if tx_cnx:
+            # use shared thread local connection, one prepared cursor per statement
+            return self.execute_sql(tx_cnx, _get_cursor(tx_cnx, sql, self._cursor_dictionary, self._use_prepared), sql, values)
+        scope_cnx = getattr(thread_local, "scope_cnx", None)
+        if scope_cnx is not None:
+            # connection pinned by scope(), leave recycling to the scope exit
+            cur = _get_cursor(scope_cnx, sql, self._cursor_dictionary, self._use_prepared)
+            result = self.execute_sql(scope_cnx, cur, sql, values)
+            if self._needs_commit and not scope_cnx.autocommit:
+                scope_cnx.commit()
+            return result
+        with mysql_cli.get_connection() as cnx:
+            cur = _get_cursor(cnx, sql, self._cursor_dictionary, self._use_prepared)
+            result = self.execute_sql(cnx, cur, sql, values)
+            if self._needs_commit and not cnx.autocommit:
+                # otherwise the write is rolled back when the connection
+                # returns to the pool and its session is reset
+                cnx.commit()
+            return result
 
     def parse_sql_params(self, *args, **kwargs):
         """Convert func param to sql param.
 
         1. try use wrapped func 's return value if not None, else use args
-        2. if args not instance of tuple, make a single value tuple, like (1,)
-        3. if args is tuple itself, then use it directly
+        2. if return value not instance of tuple, make a single value tuple, like (1,)
+        3. if return value is tuple itself, then use it directly
         :param args: function call args
         :param kwargs: function call kwargs
         :return: params tuple
         """
-
-        def make_tuple(param):
-            if not isinstance(param, tuple):
-                return param,
-            else:
-                return param
-
         returned_param = self.func(*args, **kwargs)
-        if returned_param is not None:
-            values = make_tuple(returned_param)
-        else:
-            values = make_tuple(args)
-        return values
+        if returned_param is None:
+            # args collected by *args is already a tuple
+            return args
+        # exact type check first, the common case skips the isinstance walk
+        if type(returned_param) is tuple or isinstance(returned_param, tuple):
+            return returned_param
+        return returned_param,
 
     def parse_search_and_update_sql_params(self, *args, **kwargs):
         """ support use ":word" or ? as a placeholder, but when the use of ":word" placeholder does not allow to use "?" as a placeholder
@@ -140,87 +334,163 @@ class _BaseQuery:
         2. if using "?" as a placeholder, expand the amount of "?" based on the length of each parameter
         3. if using ":word" as a placeholder, replace ":word" with a "?", expand the amout of "?" according to
            the number of values for "word" in the input parameter
+
+        self.sql is treated as an immutable template, the expanded statement is built per call
         :param args: function call args
         :param kwargs: function call kwargs
-        :return: params tuple
+        :return: (sql, params sequence)
         """
+        # 占位符风格在装饰时就确定了，直接调用对应的解析方法
+        return self._parse_search_variant(*args, **kwargs)
 
-        def handle_sql_values_by_question_placeholders(params):  # 处理问号占位符
-            values = []
-            new_sql = ''
-            placeholder_count = self.sql.count('?')
-            tmp = self.sql.split('?')
-            if len(params) != placeholder_count or placeholder_count == 0:
-                return ()  # TODO 现在只是返回空内容，后续优化，加入报错
-            # 修改sql语句将每个占位符?按实参的个数扩展，并将实参拼成一个tuple
-            for i in range(placeholder_count):
-                new_sql += tmp[i]
-                if isinstance(params[i], tuple):
-                    values += list(params[i])
-                    new_sql += ', '.join(['?'] * len(params[i]))
-                elif isinstance(params[i], list):
-                    values += params[i]
-                    new_sql += ', '.join(['?'] * len(params[i]))
-                else:
-                    values.append(params[i])
-                    new_sql += '?'
-            new_sql += tmp[placeholder_count]
-            self.sql = new_sql
-            return tuple(values)
+    def _parse_plain_statement(self, *args, **kwargs):  # 语句里没有占位符
+        self.func(*args, **kwargs)
+        return self.sql, ()
 
+    def _parse_qmark_statement(self, *args, **kwargs):  # 使用问号做占位符
+        return_params = self.func(*args, **kwargs)
+        if return_params is None:
+            return_params = args
+        elif not isinstance(return_params, tuple):
+            return_params = return_params,  # 如果不是元组，则转化成元组
+        return self._expand_question_placeholders(return_params)
 
-        def handle_sql_values_by_word_placeholders(params, placeholders):  # 处理问号占位符
+    def _parse_word_statement(self, *args, **kwargs):  # 使用":+word"的形式作为占位符
+        return_params = self.func(*args, **kwargs)
+        if return_params is None:
+            return_params = kwargs['params']
+        if not isinstance(return_params, dict):
+            raise ValueError('":word" placeholders require params as a dict')
+        return self._expand_word_placeholders(return_params, self._word_placeholders)
+
+    def _mixed_placeholder_error(self, *args, **kwargs):
+        raise ValueError('the use of ":word" placeholder does not allow to use "?" as a placeholder')
+
+    def _expand_question_placeholders(self, params):  # 处理问号占位符
+        placeholder_count = self._qmark_count
+        if len(params) != placeholder_count:  # 参数个数匹配不上直接报错
+            raise ValueError(
+                "statement has %d placeholders but %d parameters were given" % (placeholder_count, len(params)))
+        # same parameter shapes expand to the same statement, try the cache first
+        shape_key = tuple(len(param) if isinstance(param, (tuple, list)) else -1 for param in params)
+        cached_sql = self._sql_cache.get(shape_key)
+        if cached_sql is not None:
+            # another thread may evict the key between get and move_to_end,
+            # the statement text in hand stays valid either way
+            try:
+                self._sql_cache.move_to_end(shape_key)
+            except KeyError:
+                pass
             values = []
-            if len(params) != len(placeholders):  # 简单匹配下参数个数对不对
-                return ()  # 参数个数匹配不上就直接返回，TODO 加上报错
-            replace_ph = []
-            for tmp in placeholders:
-                ph = tmp[1:]
-                if ph in params.keys():
-                    if ph == "groupby" or ph == "orderby":  # groupby和orderby 不支持占位符，直接替换
-                        # 加入校验，因为无法使用占位符，不校验有SQL注入风险，判断数据只能包含大小写字母，空格，数字和下划线
-                        if not re.match(r'^[a-zA-Z0-9_ ]*$', params[ph]):
-                            return None
-                        if isinstance(params[ph], tuple):
-                            replace_ph.append(','.join(params[ph]))
-                        elif isinstance(params[ph], list):
-                            replace_ph.append(','.join(params[ph]))
-                        else:
-                            replace_ph.append(params[ph])
-                    else:
-                        if isinstance(params[ph], tuple):
-                            replace_ph.append(', '.join(['?'] * len(params[ph])))
-                            values += list(params[ph])
-                        elif isinstance(params[ph], list):
-                            replace_ph.append(', '.join(['?'] * len(params[ph])))
-                            values += params[ph]
-                        else:
-                            replace_ph.append('?')
-                            values.append(params[ph])
+            for param in params:
+                if isinstance(param, (tuple, list)):
+                    values.extend(param)
+                else:
+                    values.append(param)
+            return cached_sql, values
+
+        values = []
+        parts = []
+        tmp = self._qmark_parts
+        # bound methods hoisted out of the loop, saves an attribute lookup per
+        # placeholder in interpreted code
+        add_part = parts.append
+        add_value = values.append
+        add_values = values.extend
+        mark = self._param_mark
+        mark_run = self._param_run
+        # 将每个占位符?按实参的个数扩展，并将实参拼成一个序列
+        for i in range(placeholder_count):
+            add_part(tmp[i])
+            param = params[i]
+            if isinstance(param, (tuple, list)):
+                add_values(param)
+                add_part(mark_run(len(param)))
+            else:
+                add_value(param)
+                add_part(mark)
+        add_part(tmp[placeholder_count])
+        new_sql = ''.join(parts)
+        self._cache_expanded_sql(shape_key, new_sql)
+        return new_sql, values
+
+    def _expand_word_placeholders(self, params, placeholders):  # 处理":word"占位符
+        values = []
+        if len(params) != len(placeholders):  # 简单匹配下参数个数对不对
+            raise ValueError(
+                "statement has %d placeholders but %d parameters were given" % (len(placeholders), len(params)))
+        # identifier values are part of the statement text, list lengths decide
+        # the number of "?", together they key the expanded statement; the
+        # type name keeps e.g. the string "['a', 'b']" from aliasing the
+        # validated list ["a", "b"] and riding its cache hit unvalidated
+        try:
+            shape_key = tuple(
+                (type(params[ph]).__name__, str(params[ph])) if ph in ("groupby", "orderby")
+                else (len(params[ph]) if isinstance(params[ph], (tuple, list)) else -1)
+                for ph in placeholders)
+        except KeyError as e:
+            raise ValueError("missing value for placeholder :%s" % e.args[0]) from None
+        cached_sql = self._sql_cache.get(shape_key)
+        if cached_sql is not None:
+            # see _expand_question_placeholders, eviction can race the refresh
+            try:
+                self._sql_cache.move_to_end(shape_key)
+            except KeyError:
+                pass
+            for ph in placeholders:
+                if ph in ("groupby", "orderby"):
+                    continue  # already part of the cached statement text
+                value = params[ph]
+                if isinstance(value, (tuple, list)):
+                    values.extend(value)
                 else:
-                    return ()  # 有一个参数匹配不上就直接返回，TODO 加上报错
-            values = tuple(values)
-            for i in range(len(placeholders)):
-                self.sql = self.sql.replace(placeholders[i], replace_ph[i])
-            return values
+                    values.append(value)
+            return cached_sql, values
+        identifiers = {}
+        for ph in placeholders:
+            if ph == "groupby" or ph == "orderby":  # groupby和orderby 不支持占位符，直接替换
+                # 加入校验，因为无法使用占位符，不校验有SQL注入风险，判断数据只能包含大小写字母，空格，数字和下划线
+                value = params[ph]
+                if isinstance(value, (tuple, list)):
+                    if not all(_is_safe_identifier(v) for v in value):
+                        raise ValueError("unsafe identifier for :%s: %r" % (ph, value))
+                    identifiers[ph] = ','.join(value)
+                else:
+                    if not _is_safe_identifier(value):
+                        raise ValueError("unsafe identifier for :%s: %r" % (ph, value))
+                    identifiers[ph] = value
+
+        # 按装饰时切好的片段重建语句并按语句顺序收集实参，不修改self.sql
+        tmp = self._word_parts
+        parts = [tmp[0]]
+        add_part = parts.append
+        add_value = values.append
+        add_values = values.extend
+        # "?" on prepared cursors, "%s" on plain ones; emitting the mark
+        # directly never touches literal text, unlike a blanket str.replace
+        mark = self._param_mark
+        mark_run = self._param_run
+        for i in range(1, len(tmp), 2):
+            identifier = identifiers.get(tmp[i])
+            if identifier is not None:
+                add_part(identifier)
+            else:
+                value = params[tmp[i]]
+                if isinstance(value, (tuple, list)):
+                    add_values(value)
+                    add_part(mark_run(len(value)))
+                else:
+                    add_value(value)
+                    add_part(mark)
+            add_part(tmp[i + 1])
+        new_sql = ''.join(parts)
+        self._cache_expanded_sql(shape_key, new_sql)
+        return new_sql, values
 
-        return_params = self.func(*args, **kwargs)
-        placeholders_list = re.findall(r':\w+', self.sql)  # 统计sql语句的占位符
-
-        if len(placeholders_list) == 0:  # 使用问号做占位符
-            if return_params is None:
-                return_params = args
-            if not isinstance(return_params, tuple):
-                return_params = return_params,  # 如果不是元组，则转化成元组
-            return handle_sql_values_by_question_placeholders(return_params)
-        else:  # 使用":+word"的形式作为占位符
-            if '?' in self.sql:
-                raise ValueError('the use of ":word" placeholder does not allow to use "?" as a placeholder')
-            if return_params is None:
-                return_params = kwargs['params']
-            if not isinstance(return_params, dict):
-                return ()  # TODO 直接返回，后续可以加上报错
-            return handle_sql_values_by_word_placeholders(return_params, placeholders_list)
+    def _cache_expanded_sql(self, shape_key, new_sql):
+        self._sql_cache[shape_key] = new_sql
+        if len(self._sql_cache) > _SQL_CACHE_SIZE:
+            self._sql_cache.popitem(last=False)
 
 
 class Insert(_BaseQuery):
@@ -228,26 +498,91 @@ class Insert(_BaseQuery):
 
     """
 
-    def execute_sql(self, cnx, cur, *args, **kwargs):
-        values = self.parse_sql_params(*args, **kwargs)
-        cur.execute(self.sql, values)
+    _needs_commit = True
+
+    def execute_sql(self, cnx, cur, sql, values):
+        cur.execute(sql, values)
         return cur.lastrowid
 
 
 class BatchInsert(Insert):
-    """Execute insert sql with many row and return affected row numbers
+    """Execute insert sql with many rows and return affected row numbers
 
+    Rows are composed into multi-row "insert ... values (...),(...)" statements
+    so a batch costs one round trip per _BATCH_INSERT_ROWS rows instead of one
+    round trip per row.
+
+    The decorated function may return any iterable of value tuples, generators
+    and map objects are materialized once for chunking. On hot paths extract
+    row values with operator.itemgetter("name", "cnt") and list(map(...)),
+    which skips the per-row Python frame of a generator expression.
     """
 
+    def __init__(self, sql, batch_rows=_BATCH_INSERT_ROWS):
+        """Init base decorator.
+
+        :param sql: insert statement with a single values tuple, like "insert into t (a, b) values (?, ?)"
+        :param batch_rows: max rows composed into one statement, lower it for
+            wide rows that would overrun max_allowed_packet
+        """
+        super().__init__(sql)
+        self.batch_rows = batch_rows
+        matched = _INSERT_VALUES_RE.fullmatch(sql)
+        if matched:
+            self._values_prefix, self._row_template, self._values_suffix = matched.groups()
+        else:
+            # statement shape not recognized, fall back to per-row executemany
+            self._row_template = None
+
+    def parse_sql_params(self, *args, **kwargs):
+        """Convert func param to a sequence of row tuples.
+
+        :param args: function call args
+        :param kwargs: function call kwargs
+        :return: list or tuple of row tuples
+        """
+        rows = self.func(*args, **kwargs)
+        if rows is None:
+            rows = args
+        elif not isinstance(rows, (tuple, list)):
+            # generator or map object, materialize once for len() and slicing
+            rows = list(rows)
+        return rows
+
     @Transactional
     def execute_in_wrapper(self, *args, **kwargs):
         return super().execute_in_wrapper(*args, **kwargs)
 
-    def execute_sql(self, cnx, cur, *args, **kwargs):
-        values = self.parse_sql_params(*args, **kwargs)
-        cur.executemany(self.sql, values)
-        # https://dev.mysql.com/doc/connector-python/en/connector-python-api-mysqlcursor-rowcount.html
-        return cur.rowcount
+    def execute_sql(self, cnx, cur, sql, rows):
+        if self._row_template is None:
+            cur.executemany(sql, rows)
+            # https://dev.mysql.com/doc/connector-python/en/connector-python-api-mysqlcursor-rowcount.html
+            return cur.rowcount
+
+        affected_rows = 0
+        batch_rows = self.batch_rows
+        for start in range(0, len(rows), batch_rows):
+            chunk = rows[start:start + batch_rows]
+            # every full chunk shares one composed statement, cache it by row
+            # count next to the expanded-shape statements
+            chunk_len = len(chunk)
+            bulk_sql = self._sql_cache.get(chunk_len)
+            if bulk_sql is None:
+                bulk_sql = self._values_prefix + ','.join([self._row_template] * chunk_len) + self._values_suffix
+                self._cache_expanded_sql(chunk_len, bulk_sql)
+            else:
+                # eviction by a concurrent insert can race the LRU refresh
+                try:
+                    self._sql_cache.move_to_end(chunk_len)
+                except KeyError:
+                    pass
+            # C level flattening, no interpreted nested loop per value
+            flat_values = list(itertools.chain.from_iterable(chunk))
+            # full chunks share one bulk statement, reuse its prepared cursor
+            bulk_cur = _get_cursor(cnx, bulk_sql)
+            bulk_cur.execute(bulk_sql, flat_values)
+            affected_rows += bulk_cur.rowcount
+        return affected_rows
 
 
 class Select(_BaseQuery):
@@ -255,63 +590,174 @@ class Select(_BaseQuery):
 
     """
 
-    def __init__(self, sql, dictionary=True):
+    def __init__(self, sql, dictionary=True, row_factory=None):
         """Init base decorator.
         :param sql: sql statement to execute
         :param dictionary: rows are returned as dictionary instead of tuple
+        :param row_factory: callable building a row from (column_names, tuple_row),
+            takes precedence over dictionary, see named_row
         """
         super().__init__(sql)
         self.dictionary = dictionary
+        self.row_factory = row_factory
+        # dictionary rows are built by the connector cursor itself, a custom
+        # row factory needs the raw tuple rows instead
+        self._cursor_dictionary = dictionary and row_factory is None
 
-    def execute_sql(self, cnx, cur, *args, **kwargs):
-        values = self.parse_search_and_update_sql_params(*args, **kwargs)
-        cur.execute(self.sql, values)
-        tuple_row = cur.fetchone()
-        if self.dictionary:
-            return _convert_tuple_row_to_dict(cur.column_names, tuple_row)
-        else:
-            return tuple_row
+    def build_statement(self, *args, **kwargs):
+        return self.parse_search_and_update_sql_params(*args, **kwargs)
+
+    def execute_sql(self, cnx, cur, sql, values):
+        cur.execute(sql, values)
+        row = cur.fetchone()
+        if row is None:
+            return None
+        if self.row_factory is not None:
+            return self.row_factory(cur.column_names, row)
+        return row
 
 
 class SelectMany(Select):
     """Execute select sql and return many rows.
 
+    With stream=True an iterator is returned instead of a list, rows are
+    fetched in batches while iterating so the whole result set is never
+    materialized at once.
     """
 
-    def execute_sql(self, cnx, cur, *args, **kwargs):
-        values = self.parse_search_and_update_sql_params(*args, **kwargs)
-        cur.execute(self.sql, values)
-        tuple_rows = cur.fetchall()
-        if self.dictionary:
-            return [_convert_tuple_row_to_dict(cur.column_names, row) for row in tuple_rows]
-        else:
-            return tuple_rows
+    def __init__(self, sql, dictionary=True, stream=False, batch_size=1000, row_factory=None):
+        """Init base decorator.
+        :param sql: sql statement to execute
+        :param dictionary: rows are returned as dictionary instead of tuple
+        :param stream: return a row iterator instead of a list
+        :param batch_size: rows fetched per round trip when streaming
+        :param row_factory: callable building a row from (column_names, tuple_row),
+            takes precedence over dictionary, see named_row
+        """
+        super().__init__(sql, dictionary, row_factory)
+        self.stream = stream
+        self.batch_size = batch_size
 
+    def execute_in_wrapper(self, *args, **kwargs):
+        if not self.stream:
+            return super().execute_in_wrapper(*args, **kwargs)
+        sql, values = self.build_statement(*args, **kwargs)
+        state = getattr(thread_local, "tx_state", None)
+        tx_cnx = state.cnx if state is not None else None
+        if tx_cnx:
+            # shared thread local connection, leave recycling to Transactional
+            return self._stream_rows(tx_cnx, False, _get_cursor(tx_cnx, sql, self._cursor_dictionary, self._use_prepared), sql, values)
+        scope_cnx = getattr(thread_local, "scope_cnx", None)
+        if scope_cnx is not None:
+            # connection pinned by scope(), leave recycling to the scope exit
+            return self._stream_rows(scope_cnx, False, _get_cursor(scope_cnx, sql, self._cursor_dictionary, self._use_prepared), sql, values)
+        cnx = mysql_cli.get_connection()
+        return self._stream_rows(cnx, True, _get_cursor(cnx, sql, self._cursor_dictionary, self._use_prepared), sql, values)
+
+    def _stream_rows(self, cnx, recycle, cur, sql, values):
+        # generator holding the connection until exhausted or closed, the
+        # finally block also runs on GeneratorExit when a caller stops early
+        try:
+            cur.execute(sql, values)
+            batch_size = self.batch_size
+            cur.arraysize = batch_size
+            row_factory = self.row_factory
+            column_names = cur.column_names if row_factory else None
+            while True:
+                batch = cur.fetchmany(batch_size)
+                if not batch:
+                    break
+                if row_factory is not None:
+                    for row in batch:
+                        yield row_factory(column_names, row)
+                else:
+                    yield from batch
+        finally:
+            # a caller stopping early leaves the result set half-read on the
+            # wire; drain it first, otherwise a transaction/scope connection
+            # stays blocked and check-in of a pooled one raises from
+            # reset_session ("Unread result found") yet still re-queues it
+            if cnx.unread_result:
+                cnx.consume_results()
+            if recycle:
+                cnx.close()
+
+    def execute_sql(self, cnx, cur, sql, values):
+        cur.execute(sql, values)
+        rows = cur.fetchall()
+        if self.row_factory is not None:
+            # column_names walks cur.description on each access, read it once;
+            # map() sizes and fills the result list in C, no per-row bytecode
+            return list(map(functools.partial(self.row_factory, cur.column_names), rows))
+        return rows
+
+
+# BatchInsert instances built by insert_many, cached per statement so the
+# parsed template and composed bulk statements are reused across calls
+_bulk_inserts = {}
+
+
+def insert_many(sql, rows):
+    """Insert many rows with a single-row insert template and return affected row numbers.
+
+    Module level entry for bulk loads without declaring a decorator, rows go
+    through the same multi-row statement composition as BatchInsert.
+    :param sql: insert statement with a single values tuple, like "insert into t (a, b) values (?, ?)"
+    :param rows: sequence of value tuples, one per row
+    :return: affected row numbers
+    """
+    bulk = _bulk_inserts.get(sql)
+    if bulk is None:
+        bulk = BatchInsert(sql)
+        bulk(lambda insert_rows: insert_rows)
+        _bulk_inserts[sql] = bulk
+    return bulk(rows)
 
-def _convert_tuple_row_to_dict(column_names, tuple_row):
-    # convert tuple to dict with column names
-    # https://dev.mysql.com/doc/connector-python/en/connector-python-api-mysqlcursor-column-names.html
-    if tuple_row:
-        return dict(zip(column_names, tuple_row))
 
+# namedtuple row classes cached per column set
+_row_classes = {}
 
-class Update(_BaseQuery):
-    """Execute update sql and return affected row numbers
 
+def named_row(column_names, tuple_row):
+    """Row factory building namedtuple rows.
+
+    A namedtuple costs a fraction of the memory of a dict per row and keeps
+    index access; the row class is built once per column set and cached.
+    Columns that are not valid identifiers, like "count(*)" or unaliased
+    expressions, become positional "_0"-style fields instead of raising.
+    :param column_names: column names tuple from the cursor
+    :param tuple_row: row fetched as tuple
+    :return: namedtuple row
     """
+    row_cls = _row_classes.get(column_names)
+    if row_cls is None:
+        row_cls = collections.namedtuple("Row", column_names, rename=True)
+        _row_classes[column_names] = row_cls
+    return row_cls._make(tuple_row)
 
-    def execute_sql(self, cnx, cur, *args, **kwargs):
-        values = self.parse_search_and_update_sql_params(*args, **kwargs)
-        cur.execute(self.sql, values)
+
+class _ModifyQuery(_BaseQuery):
+    """Execute a modifying sql and return affected row numbers
+
+    """
+
+    _needs_commit = True
+
+    def build_statement(self, *args, **kwargs):
+        return self.parse_search_and_update_sql_params(*args, **kwargs)
+
+    def execute_sql(self, cnx, cur, sql, values):
+        cur.execute(sql, values)
         return cur.rowcount
 
 
-class Delete(_BaseQuery):
-    """Execute delete sql and return affected row numbers
+class Update(_ModifyQuery):
+    """Execute update sql and return affected row numbers
 
     """
 
-    def execute_sql(self, cnx, cur, *args, **kwargs):
-        values = self.parse_search_and_update_sql_params(*args, **kwargs)
-        cur.execute(self.sql, values)
-        return cur.rowcount
+
+class Delete(_ModifyQuery):
+    """Execute delete sql and return affected row numbers
+
+    """
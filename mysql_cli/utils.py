@@ -1,5 +1,6 @@
 from mysql.connector.pooling import PooledMySQLConnection
 
+from mysql_cli import client
 from mysql_cli.client import MySQLWrapper
 
 
@@ -12,4 +13,4 @@ def init_from_conf_file(mysql_conf_file):
 
 
 def get_connection() -> PooledMySQLConnection:
-    return MySQLWrapper.get_connection()
+    return client.get_connection()
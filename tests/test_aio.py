@@ -0,0 +1,35 @@
+from mysql_cli.aio import AsyncSelect, AsyncSelectMany
+
+
+@AsyncSelect("select id, name, cnt from my_test where name = ? and cnt in (?);", dictionary=False)
+def async_select_by_name_and_in(name, cnt):
+    return name, cnt
+
+
+@AsyncSelectMany("select id, name, cnt from my_test where name = :name and cnt in (:cnt) limit :limit;")
+def async_select_by_word_placeholders(params: dict):
+    return params
+
+
+def test_async_qmark_expansion_emits_format_marks():
+    # aiomysql binds with "%s" only, expansion must emit it directly
+    # instead of rewriting "?" after the statement is built
+    sql, values = async_select_by_name_and_in.build_statement("hello", [2, 3])
+    assert sql == "select id, name, cnt from my_test where name = %s and cnt in (%s, %s);"
+    assert list(values) == ["hello", 2, 3]
+
+
+def test_async_word_expansion_emits_format_marks():
+    params = {"name": "hello", "cnt": [2, 3], "limit": 1}
+    sql, values = async_select_by_word_placeholders.build_statement(params=params)
+    assert sql == "select id, name, cnt from my_test where name = %s and cnt in (%s, %s) limit %s;"
+    assert list(values) == ["hello", 2, 3, 1]
+
+
+def test_async_select_many_init_chain():
+    # the diamond MRO must still run AsyncSelect.__init__ so the "%s"
+    # mark selection reaches AsyncSelectMany instances
+    decorator = async_select_by_word_placeholders
+    assert isinstance(decorator, AsyncSelectMany)
+    assert isinstance(decorator, AsyncSelect)
+    assert decorator._param_mark == "%s"
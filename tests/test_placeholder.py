@@ -0,0 +1,96 @@
+import pytest
+
+from mysql_cli.query import Select, Update
+
+
+@Select("select id, name, cnt from my_test where name = ? and cnt in (?);", dictionary=False)
+def select_by_name_and_in(name, cnt):
+    return name, cnt
+
+
+@Select("select id, name, cnt from my_test where name = ? and cnt in (?);", dictionary=False)
+def select_by_loose_args(*args):
+    return args
+
+
+@Update("update my_test set cnt = :cnt where name in (:name) order by :orderby limit :limit;")
+def update_by_word_placeholders(params: dict):
+    return params
+
+
+@Select("select id, name, cnt from my_test where name = :name and cnt = :cnt;")
+def select_by_word_placeholders(params: dict):
+    return params
+
+
+def test_question_placeholder_expansion():
+    decorator = select_by_name_and_in
+    sql, values = decorator.parse_search_and_update_sql_params("hello", [2, 3])
+    assert sql == "select id, name, cnt from my_test where name = ? and cnt in (?, ?);"
+    assert list(values) == ["hello", 2, 3]
+    # same shape hits the statement cache, different shape expands again
+    cached_sql, _ = decorator.parse_search_and_update_sql_params("world", [4, 5])
+    assert cached_sql == sql
+    sql, values = decorator.parse_search_and_update_sql_params("hello", [2])
+    assert sql == "select id, name, cnt from my_test where name = ? and cnt in (?);"
+    assert list(values) == ["hello", 2]
+
+
+def test_question_placeholder_count_mismatch():
+    with pytest.raises(ValueError) as e:
+        select_by_loose_args.parse_search_and_update_sql_params("hello", [2], "extra")
+    assert "2 placeholders" in e.value.args[0]
+
+
+def test_word_placeholder_expansion():
+    params = {"cnt": 5, "name": ["a", "b"], "orderby": "cnt desc", "limit": 2}
+    sql, values = update_by_word_placeholders.parse_search_and_update_sql_params(params=params)
+    # identifier-bearing statements run on a plain cursor with "%s" binding
+    assert sql == "update my_test set cnt = %s where name in (%s, %s) order by cnt desc limit %s;"
+    assert list(values) == [5, "a", "b", 2]
+
+
+def test_word_placeholder_missing_param():
+    with pytest.raises(ValueError) as e:
+        select_by_word_placeholders.parse_search_and_update_sql_params(params={"name": "hello", "count": 1})
+    assert "cnt" in e.value.args[0]
+
+
+def test_word_placeholder_requires_dict():
+    with pytest.raises(ValueError):
+        select_by_word_placeholders.parse_search_and_update_sql_params(params=("hello", 1))
+
+
+def test_template_not_mutated():
+    # decorator instances are shared across threads, the template must stay
+    # immutable no matter how parameter shapes vary between calls
+    decorator = select_by_name_and_in
+    template = decorator.sql
+    decorator.parse_search_and_update_sql_params("a", [1, 2, 3])
+    decorator.parse_search_and_update_sql_params("b", [1])
+    assert decorator.sql == template
+
+    word_decorator = update_by_word_placeholders
+    word_template = word_decorator.sql
+    word_decorator.parse_search_and_update_sql_params(
+        params={"cnt": 1, "name": ["a"], "orderby": "cnt", "limit": 1})
+    assert word_decorator.sql == word_template
+
+
+def test_unsafe_identifier():
+    params = {"cnt": 5, "name": ["a"], "orderby": "cnt; drop table my_test", "limit": 1}
+    with pytest.raises(ValueError) as e:
+        update_by_word_placeholders.parse_search_and_update_sql_params(params=params)
+    assert "orderby" in e.value.args[0]
+
+
+def test_unsafe_identifier_not_cached():
+    # a validated list must not shadow a string whose str() happens to match,
+    # the string has to go through identifier validation itself
+    params = {"cnt": 5, "name": ["a"], "orderby": ["cnt", "name"], "limit": 1}
+    sql, _ = update_by_word_placeholders.parse_search_and_update_sql_params(params=params)
+    assert "order by cnt,name" in sql
+    params["orderby"] = str(["cnt", "name"])
+    with pytest.raises(ValueError) as e:
+        update_by_word_placeholders.parse_search_and_update_sql_params(params=params)
+    assert "orderby" in e.value.args[0]
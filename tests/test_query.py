@@ -1,7 +1,7 @@
 import os
 
 import mysql_cli
-from mysql_cli import BatchInsert, Delete, Insert, Select, SelectMany, Transactional, Update
+from mysql_cli import BatchInsert, Delete, Insert, Select, SelectMany, Transactional, Update, insert_many
 from mysql_cli.query import thread_local
 
 TESTS_PATH = os.path.dirname(__file__)
@@ -24,7 +24,9 @@ def setup():
             )
             cur.execute(stmt_create)
 
-            assert insert_with_dict({"name": "hello", "cnt": 2}) == 1
+            first_id = insert_with_dict({"name": "hello", "cnt": 2})
+            # lastrowid comes straight from the OK packet, no follow-up query
+            assert isinstance(first_id, int) and first_id == 1
             assert insert_with_param("hello", 3) == 2
 
 
@@ -80,6 +82,10 @@ def select_without_param():
 def select_many_by_name(name, cnt):
     return name, cnt
 
+@SelectMany("select name, cnt from my_test where name = ? and cnt >= ? order by cnt desc;", stream=True)
+def stream_many_by_name(name, cnt):
+    return name, cnt
+
 @SelectMany("select * from my_test where name in (:name) and cnt > :cnt limit :limit offset :offset")
 def select_many_by_query_clauses(params: dict):
     return params
@@ -130,7 +136,10 @@ def delete_by_word_placeholders(params:dict):
 
 def test_batch_insert():
     params = [{"name": "world", "cnt": 1}, {"name": "world", "cnt": 2}, {"name": "world", "cnt": 3}]
-    assert batch_insert(params) == 3
+    affected_rows = batch_insert(params)
+    # multi-row statements make rowcount authoritative, no negative
+    # executemany aggregates
+    assert isinstance(affected_rows, int) and affected_rows == 3
 
 
 def test_select_one():
@@ -143,6 +152,10 @@ def test_select_one():
     row = select_one_by_in("world",[2,3])
     assert row == (4, 'world', 2)
 
+    # call again with another in-list length, sql template should not be polluted
+    row = select_one_by_in("world", [2])
+    assert row == (4, 'world', 2)
+
     row = select_one_by_in_more_condition("world", [2, 3],1,1)
     assert row == (5, 'world', 3)
 
@@ -168,6 +181,13 @@ def test_select_many():
     assert "id" not in rows[0]
 
 
+def test_select_many_stream():
+    rows = list(stream_many_by_name("hello", 1))
+    assert len(rows) == 2
+    assert rows[0]["cnt"] == 3
+    assert rows[1]["name"] == "hello"
+
+
 def test_update_one():
     insert_with_param("update_one", 1)
     insert_with_param("update_one", 2)
@@ -178,9 +198,9 @@ def test_update_one():
 
 
 def test_update_many():
-    insert_with_param("update_many", 1)
-    insert_with_param("update_many", 2)
-    insert_with_param("update_many", 3)
+    # one multi-row statement instead of three round trips
+    assert insert_many("insert into my_test (name, cnt) values (?, ?);",
+                       [("update_many", 1), ("update_many", 2), ("update_many", 3)]) == 3
 
     assert update_cnt_by_name("update_many", 0) == 3
     assert update_cnt_by_name_and_in(["update_one", "update_many"], 4, 2) == 2
@@ -281,6 +301,25 @@ def test_delete_many():
     assert select_one_return_dict("delete_many") is None
 
 
+def test_scope():
+    with mysql_cli.scope():
+        scope_cnx = getattr(thread_local, "scope_cnx", None)
+        assert scope_cnx is not None
+        # queries share the pinned connection, writes commit on their own
+        assert insert_with_param("scope_test", 1) > 0
+        assert select_one_return_dict("scope_test")["cnt"] == 1
+        with mysql_cli.scope():
+            # nested scope reuses the outer connection
+            assert getattr(thread_local, "scope_cnx", None) is scope_cnx
+            assert update_cnt_by_name("scope_test", 2) == 1
+        # inner exit must not release the outer pin
+        assert getattr(thread_local, "scope_cnx", None) is scope_cnx
+        assert select_one_return_dict("scope_test")["cnt"] == 2
+    # outermost exit recycles the connection, queries run unpinned again
+    assert getattr(thread_local, "scope_cnx", None) is None
+    assert delete_by_name("scope_test") == 1
+
+
 @Transactional
 def transaction_rollback():
     params = [{"name": "tx_rollback", "cnt": 1}, {"name": "tx_rollback", "cnt": 2}]
@@ -288,7 +327,7 @@ def transaction_rollback():
 
     assert select_one_return_dict("tx_rollback")["name"] == "tx_rollback"
     update_cnt_by_name("tx_rollback", 3)
-    assert "tx_cnx" in thread_local.__dict__
+    assert getattr(thread_local, "tx_state", None).cnx is not None
     raise RuntimeError("rollback")
 
 
@@ -297,7 +336,8 @@ def test_transaction_rollback():
         transaction_rollback()
     except RuntimeError:
         pass
-    assert "tx_cnx" not in thread_local.__dict__
+    tx_state = getattr(thread_local, "tx_state", None)
+    assert tx_state is None or tx_state.cnx is None
     assert select_one_return_dict("tx_rollback") is None
 
 
@@ -306,11 +346,12 @@ def transaction_commit():
     params = [{"name": "tx_commit", "cnt": 1}, {"name": "tx_commit", "cnt": 2}]
     batch_insert(params)
     update_cnt_by_name("tx_commit", 3)
-    assert "tx_cnx" in thread_local.__dict__
+    assert getattr(thread_local, "tx_state", None).cnx is not None
 
 
 def test_transaction_commit():
     transaction_commit()
-    assert "tx_cnx" not in thread_local.__dict__
+    tx_state = getattr(thread_local, "tx_state", None)
+    assert tx_state is None or tx_state.cnx is None
     assert select_one_return_dict("tx_commit")["name"] == "tx_commit"
     assert select_one_return_dict("tx_commit")["cnt"] == 3